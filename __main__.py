@@ -3,7 +3,9 @@
 Allow running devin-cli as a module: python -m devin-cli
 """
 
+import sys
+
 from devin_cli import cli
 
 if __name__ == '__main__':
-    cli()
+    sys.exit(cli(prog_name='devin-cli'))
@@ -0,0 +1,32 @@
+#!/bin/bash
+# Build a standalone devin-cli binary with Nuitka
+# The compiled binary skips Python interpreter startup and module imports on every run.
+
+echo "🔨 Building standalone Devin CLI binary..."
+
+# Check if Python 3 is available
+if ! command -v python3 &> /dev/null; then
+    echo "❌ Python 3 is required but not found. Please install Python 3."
+    exit 1
+fi
+
+# Install build and runtime dependencies
+echo "📦 Installing build dependencies..."
+python3 -m pip install nuitka click requests --user || exit 1
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+OUTPUT_DIR="$SCRIPT_DIR/dist"
+
+# Compile to a single executable; requests is imported lazily so follow it explicitly
+python3 -m nuitka \
+    --onefile \
+    --lto=yes \
+    --include-package=requests \
+    --output-dir="$OUTPUT_DIR" \
+    --output-filename=devin-cli \
+    "$SCRIPT_DIR/devin_cli.py" || exit 1
+
+echo "✅ Build complete: $OUTPUT_DIR/devin-cli"
+echo ""
+echo "Copy it somewhere on your PATH, e.g.:"
+echo "  cp $OUTPUT_DIR/devin-cli ~/.local/bin/"
@@ -5,12 +5,21 @@ A command line tool for creating Devin sessions with built-in authentication man
 """
 
 import os
+import re
 import sys
-import json
-import requests
+import atexit
+import functools
+import time
+import threading
 import click
 from pathlib import Path
-from typing import Optional, List
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Optional, List, Mapping
+
+if TYPE_CHECKING:
+    import requests
+
+__version__ = '1.1.0'
 
 
 class DevinAPIError(Exception):
@@ -18,11 +27,147 @@ class DevinAPIError(Exception):
     pass
 
 
+# Maximum pooled connections per host; also bounds concurrent batch requests
+_POOL_MAXSIZE = 10
+
+
+def _build_session() -> 'requests.Session':
+    """Build a pooled HTTP session so TLS connections are reused across API calls"""
+    # requests is imported lazily to keep --help/--version startup fast
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    # Retry transient failures (connection errors, rate limiting, gateway errors)
+    # with exponential backoff rather than making the user re-run the command.
+    # Status and read-timeout retries are limited to idempotent methods: a 502/504
+    # or timeout on POST doesn't mean the API dropped it, so retrying could create
+    # a duplicate session or message. Connect errors are still retried for POST
+    # because the request never reached the server.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD')
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session.mount('https://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+
+# Shared session for all Devin API requests, created on first use
+_SESSION = None
+
+
+def _get_session() -> 'requests.Session':
+    """Get the shared API session, building it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session()
+        atexit.register(_SESSION.close)
+    return _SESSION
+
+@functools.lru_cache(maxsize=4)
+def _auth_headers(api_key: str) -> Mapping[str, str]:
+    """Build the read-only Authorization header for an API key once and reuse it"""
+    return MappingProxyType({'Authorization': f'Bearer {api_key}'})
+
+
+def _prewarm_connection() -> None:
+    """Open the TCP+TLS connection to the API in the background
+    
+    Called at the start of commands that talk to the API, so the handshake overlaps
+    with prompting and argument handling. The pooled session keeps the socket open
+    and the first real request skips it. Set DEVIN_CLI_NO_PREWARM=1 to disable.
+    """
+    if os.getenv('DEVIN_CLI_NO_PREWARM') == '1':
+        return
+    session = _get_session()
+    
+    def warm():
+        try:
+            session.head('https://api.devin.ai/v1/', timeout=5)
+        except Exception:
+            pass  # The real request will surface any network problem
+    
+    threading.Thread(target=warm, daemon=True).start()
+
+
+@functools.lru_cache(maxsize=None)
+def _orjson_codec():
+    """Import the optional orjson codec on first use
+    
+    Returns (loads, pretty_dumps, dumps) with the pretty-print options bound once,
+    or None when orjson is not installed.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson.loads, functools.partial(orjson.dumps, option=orjson.OPT_INDENT_2), orjson.dumps
+
+
+def _json_loads(data: bytes):
+    """Decode a JSON document, using orjson when it is installed"""
+    codec = _orjson_codec()
+    if codec is not None:
+        return codec[0](data)
+    import json
+    return json.loads(data)
+
+
+def _json_encode(obj) -> bytes:
+    """Serialize a request body to compact UTF-8 JSON, using orjson when it is installed"""
+    codec = _orjson_codec()
+    if codec is not None:
+        return codec[2](obj)
+    import json
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_dumps(obj) -> str:
+    """Pretty-print an object as JSON, using orjson when it is installed"""
+    codec = _orjson_codec()
+    if codec is not None:
+        return codec[1](obj).decode()
+    import json
+    # Keep non-ASCII text as-is, matching orjson's output
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+# In-process cache of the token read from disk, keyed by token file path
+_TOKEN_TTL = 60
+_TOKEN_CACHE = {'value': None, 'path': None, 'ts': 0.0}
+
+
+def _cache_token(token_file: Path, value: Optional[str]) -> None:
+    """Store (or clear, when value is None) the cached file token"""
+    _TOKEN_CACHE['value'] = value
+    _TOKEN_CACHE['path'] = token_file
+    _TOKEN_CACHE['ts'] = time.monotonic()
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """Create a directory once per process; later calls skip the mkdir syscall"""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def get_config_dir() -> Path:
-    """Get the configuration directory for storing auth tokens"""
-    config_dir = Path.home() / '.devin-cli'
-    config_dir.mkdir(exist_ok=True)
-    return config_dir
+    """Get the configuration directory for storing auth tokens, without creating it"""
+    return Path.home() / '.devin-cli'
+
+
+def _ensure_config_dir() -> Path:
+    """Create the configuration directory if needed; called only on write paths"""
+    return _ensure_dir(get_config_dir())
 
 
 def get_token_file() -> Path:
@@ -30,16 +175,30 @@ def get_token_file() -> Path:
     return get_config_dir() / 'token'
 
 
+def _write_private_file(path: Path, content: str) -> None:
+    """Write content to path, readable only by the owner"""
+    if os.name != 'nt':
+        # Create the file readable only by owner (600) in the same call that opens it,
+        # so the content is never briefly world-readable
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode above only applies to a new file; tighten an existing one too
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+    else:
+        # Write file with restricted permissions
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o600)
+
+
 def save_token(token: str) -> None:
     """Save the API token to a secure file"""
+    token = token.strip()
     token_file = get_token_file()
-    
-    # Write token to file with restricted permissions
-    with open(token_file, 'w') as f:
-        f.write(token.strip())
-    
-    # Set file permissions to be readable only by owner (600)
-    os.chmod(token_file, 0o600)
+    _ensure_config_dir()
+    _write_private_file(token_file, token)
+    _cache_token(token_file, token)
     click.echo(f"✅ Token saved securely to {token_file}")
 
 
@@ -50,16 +209,24 @@ def load_token() -> Optional[str]:
     if env_token:
         return env_token.strip()
     
-    # Then try saved token file
+    # Then try saved token file, reusing a recent read if we have one
     token_file = get_token_file()
-    if token_file.exists():
-        try:
-            with open(token_file, 'r') as f:
-                return f.read().strip()
-        except Exception as e:
-            click.echo(f"⚠️  Warning: Could not read saved token: {e}", err=True)
+    if (_TOKEN_CACHE['value'] is not None and _TOKEN_CACHE['path'] == token_file
+            and time.monotonic() - _TOKEN_CACHE['ts'] < _TOKEN_TTL):
+        return _TOKEN_CACHE['value']
+    
+    # Read directly and treat a missing file as "no token", saving a separate stat
+    try:
+        token = token_file.read_text().strip()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        _cache_token(token_file, None)
+        click.echo(f"⚠️  Warning: Could not read saved token: {e}", err=True)
+        return None
     
-    return None
+    _cache_token(token_file, token)
+    return token
 
 
 def get_api_key() -> str:
@@ -77,19 +244,14 @@ def get_api_key() -> str:
 
 
 def test_token(token: str) -> bool:
-    """Test if a token is valid by making a test API request"""
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
-    
-    # Make a minimal test request
+    """Test if a token is valid with a lightweight authenticated request"""
+    # List sessions rather than creating one, so the probe has no side effects
     try:
-        response = requests.post(
+        response = _get_session().get(
             'https://api.devin.ai/v1/sessions',
-            headers=headers,
-            json={'prompt': 'test'},
-            timeout=10
+            headers=_auth_headers(token),
+            params={'limit': 1},
+            timeout=5
         )
         # Check for authentication errors
         if response.status_code in [401, 403]:
@@ -101,83 +263,295 @@ def test_token(token: str) -> bool:
         return True
 
 
-def make_api_request(payload: dict) -> dict:
+def make_api_request(payload: dict, api_key: Optional[str] = None) -> dict:
     """Make API request to create Devin session"""
-    api_key = get_api_key()
+    api_key = api_key or get_api_key()
     
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
+    import requests
     
     try:
-        response = requests.post(
+        response = _get_session().post(
             'https://api.devin.ai/v1/sessions',
-            headers=headers,
-            json=payload,
+            headers=_auth_headers(api_key),
+            data=_json_encode(payload),
             timeout=30
         )
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except requests.exceptions.RequestException as e:
         raise DevinAPIError(f"API request failed: {e}")
+    except ValueError as e:
+        raise DevinAPIError(f"Invalid JSON in API response: {e}")
+
+
+def create_sessions(payloads: List[dict], api_key: Optional[str] = None) -> list:
+    """Create several Devin sessions concurrently over the pooled connections
+    
+    Returns one entry per payload, in order: the API result, or the
+    DevinAPIError raised for that payload.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    api_key = api_key or get_api_key()
+    # Build the shared session here; _get_session() is not locked, so workers racing
+    # on the first call could each create their own
+    _get_session()
+    with ThreadPoolExecutor(max_workers=max(1, min(_POOL_MAXSIZE, len(payloads)))) as executor:
+        futures = [executor.submit(make_api_request, payload, api_key) for payload in payloads]
+    
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except DevinAPIError as e:
+            results.append(e)
+    return results
+
 
+# Bounds on the on-disk HTTP cache: entries unused for a week are dropped, and
+# only the most recently used ones are kept beyond that
+_HTTP_CACHE_MAX_ENTRIES = 50
+_HTTP_CACHE_MAX_AGE = 7 * 24 * 60 * 60
 
-def get_session_details(session_id: str) -> dict:
+
+def _prune_http_cache(cache_dir: Path) -> None:
+    """Remove expired cache entries, then the least recently used ones over the cap"""
+    now = time.time()
+    entries = []
+    for entry in cache_dir.glob('*.json'):
+        try:
+            mtime = entry.stat().st_mtime
+            if now - mtime > _HTTP_CACHE_MAX_AGE:
+                entry.unlink()
+            else:
+                entries.append((mtime, entry))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, entry in entries[_HTTP_CACHE_MAX_ENTRIES:]:
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+
+def _http_cache_file(url: str, api_key: str) -> Path:
+    """Get the cache entry path for a URL, keyed per API key"""
+    import hashlib
+    
+    digest = hashlib.sha1(f'{url}\n{api_key}'.encode('utf-8')).hexdigest()
+    return get_config_dir() / 'cache' / f'{digest}.json'
+
+
+def _conditional_get(url: str, api_key: str) -> bytes:
+    """GET a URL, revalidating a cached copy with ETag/Last-Modified when we have one
+    
+    On 304 Not Modified the cached body is returned without transferring it again.
+    """
+    import json
+    
+    headers = dict(_auth_headers(api_key))
+    cache_file = _http_cache_file(url, api_key)
+    cached = None
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+        if not isinstance(cached, dict) or not isinstance(cached.get('body'), str):
+            raise ValueError("malformed cache entry")  # Treat as a cache miss
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    except (OSError, ValueError):
+        cached = None
+    
+    response = _get_session().get(url, headers=headers, timeout=30)
+    if response.status_code == 304 and cached is not None:
+        try:
+            os.utime(cache_file)  # Mark as recently used so pruning keeps it
+        except OSError:
+            pass
+        return cached['body'].encode('utf-8')
+    response.raise_for_status()
+    
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        try:
+            _ensure_dir(_ensure_config_dir() / 'cache')
+            # Write then rename so concurrent readers never see a partial entry
+            tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+            _write_private_file(tmp_file, json.dumps({
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': response.content.decode('utf-8')
+            }))
+            os.replace(tmp_file, cache_file)
+            _prune_http_cache(cache_file.parent)
+        except (OSError, UnicodeDecodeError):
+            pass  # Caching is best-effort
+    return response.content
+
+
+def get_session_details(session_id: str, api_key: Optional[str] = None) -> dict:
     """Get details of an existing Devin session"""
-    api_key = get_api_key()
+    api_key = api_key or get_api_key()
     
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
+    import requests
     
     try:
-        response = requests.get(
-            f'https://api.devin.ai/v1/sessions/{session_id}',
-            headers=headers,
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
+        content = _conditional_get(f'https://api.devin.ai/v1/sessions/{session_id}', api_key)
+        return _json_loads(content)
     except requests.exceptions.RequestException as e:
         raise DevinAPIError(f"API request failed: {e}")
+    except ValueError as e:
+        raise DevinAPIError(f"Invalid JSON in API response: {e}")
 
 
-def send_message_to_session(session_id: str, payload: dict) -> dict:
+def send_message_to_session(session_id: str, payload: dict, api_key: Optional[str] = None) -> dict:
     """Send a message to an existing Devin session"""
-    api_key = get_api_key()
+    api_key = api_key or get_api_key()
     
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
+    import requests
     
     try:
-        response = requests.post(
+        response = _get_session().post(
             f'https://api.devin.ai/v1/sessions/{session_id}/message',
-            headers=headers,
-            json=payload,
+            headers=_auth_headers(api_key),
+            data=_json_encode(payload),
             timeout=30
         )
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except requests.exceptions.RequestException as e:
         raise DevinAPIError(f"API request failed: {e}")
+    except ValueError as e:
+        raise DevinAPIError(f"Invalid JSON in API response: {e}")
+
+
+def get_context_api_key(ctx: click.Context) -> str:
+    """Resolve the API key once per CLI invocation and share it through the click context"""
+    ctx.ensure_object(dict)
+    if 'api_key' not in ctx.obj:
+        ctx.obj['api_key'] = get_api_key()
+    return ctx.obj['api_key']
+
+
+# Comma separator including any whitespace around it
+_LIST_SEP = re.compile(r'\s*,\s*')
 
 
 def parse_list_input(value: str) -> List[str]:
     """Parse comma-separated string into list"""
     if not value:
         return []
-    return [item.strip() for item in value.split(',') if item.strip()]
+    # Split and strip in one C-level pass, then drop the empty items
+    return list(filter(None, _LIST_SEP.split(value.strip())))
+
+
+# Optional session fields and how each CLI value is carried into the payload:
+# 'flag' fields are sent whenever set (even if falsy), 'text' fields when non-empty,
+# and 'list' fields are comma-separated strings sent as lists when non-empty
+_CREATE_FIELDS = (
+    ('snapshot_id', 'text'),
+    ('unlisted', 'flag'),
+    ('idempotent', 'flag'),
+    ('max_acu_limit', 'flag'),
+    ('secret_ids', 'list'),
+    ('knowledge_ids', 'list'),
+    ('tags', 'list'),
+    ('title', 'text'),
+)
+
+
+def build_create_payload(prompt: str, **fields) -> dict:
+    """Build the session creation payload, leaving out options that were not provided"""
+    payload = {'prompt': prompt}
+    payload.update({
+        name: parse_list_input(fields[name]) if kind == 'list' else fields[name]
+        for name, kind in _CREATE_FIELDS
+        if (fields.get(name) is not None if kind == 'flag' else fields.get(name))
+    })
+    return payload
+
+
+# Template opened in $EDITOR by `create --interactive-batch`; everything after
+# the marker line is the prompt, so task descriptions can span several lines
+_BATCH_PROMPT_MARKER = '--- prompt ---'
+_BATCH_TEMPLATE = (
+    "# Fill in the session fields below, then save and close the editor.\n"
+    "# Lines starting with '#' are ignored. Leave a value empty to skip it.\n"
+    "# List fields are comma-separated; yes/no fields accept yes, no, true or false.\n"
+    f"# Write the task description below the '{_BATCH_PROMPT_MARKER}' line; it is kept as written.\n"
+    + ''.join(f"{name} = {{{name}}}\n" for name, _ in _CREATE_FIELDS)
+    + f"{_BATCH_PROMPT_MARKER}\n{{prompt}}\n"
+)
+
+
+def load_batch_payloads(lines) -> List[dict]:
+    """Parse a JSON Lines stream of session payloads, one object per line"""
+    payloads = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            payload = _json_loads(line)
+        except ValueError as e:
+            raise click.BadParameter(f"line {line_number} is not valid JSON: {e}")
+        if not isinstance(payload, dict) or not payload.get('prompt'):
+            raise click.BadParameter(f"line {line_number} must be a JSON object with a 'prompt'")
+        payloads.append(payload)
+    if not payloads:
+        raise click.BadParameter("no payloads found; add one JSON object per line")
+    return payloads
+
+
+def parse_batch_input(text: str) -> dict:
+    """Parse the key = value lines and trailing prompt section of a filled-in batch template"""
+    values = {}
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip() == _BATCH_PROMPT_MARKER:
+            prompt = '\n'.join(lines[index + 1:]).strip()
+            if prompt:
+                values['prompt'] = prompt
+            lines = lines[:index]
+            break
+    
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        key, sep, value = line.partition('=')
+        key = key.strip()
+        if not sep or key not in dict(_CREATE_FIELDS):
+            raise click.BadParameter(f"Unrecognized line in template: {line}")
+        value = value.strip()
+        if not value:
+            continue
+        if key in ('unlisted', 'idempotent'):
+            if value.lower() not in ('yes', 'no', 'true', 'false', 'y', 'n'):
+                raise click.BadParameter(f"{key} must be yes or no, got '{value}'")
+            value = value.lower() in ('yes', 'true', 'y')
+        elif key == 'max_acu_limit':
+            try:
+                value = int(value)
+            except ValueError:
+                raise click.BadParameter(f"max_acu_limit must be an integer, got '{value}'")
+        values[key] = value
+    return values
+
+
+# Shared --output option, built once and applied to every command that prints results
+_OUTPUT_CHOICE = click.Choice(('json', 'table'))
+output_option = click.option('--output', '-o', type=_OUTPUT_CHOICE, default='table', help='Output format')
 
 
 @click.group(invoke_without_command=True)
 @click.pass_context
-@click.version_option(version='1.1.0')
+@click.version_option(version=__version__)
 def cli(ctx):
     """Devin CLI - Create and manage Devin sessions"""
+    ctx.ensure_object(dict)
     if ctx.invoked_subcommand is None:
         # Default behavior - show help
         click.echo(ctx.get_help())
@@ -201,8 +575,10 @@ def auth(test):
         return
     
     # Set token
+    _prewarm_connection()
     click.echo("Enter your Devin API token (get it from: https://api.devin.ai)")
-    token = click.prompt('Token', hide_input=True, type=str)
+    # Strip once here; everything downstream treats the token as canonical
+    token = click.prompt('Token', hide_input=True, type=str).strip()
     
     click.echo("Testing token...")
     if test_token(token):
@@ -213,6 +589,37 @@ def auth(test):
         sys.exit(1)
 
 
+def _create_batch(ctx: click.Context, batch, output: str) -> None:
+    """Create every session in a JSON Lines batch file and report the results"""
+    try:
+        payloads = load_batch_payloads(batch)
+    except click.BadParameter as e:
+        e.param_hint = "'--batch'"
+        raise
+    
+    click.echo(f"Creating {len(payloads)} Devin session{'s' if len(payloads) != 1 else ''}...")
+    results = create_sessions(payloads, api_key=get_context_api_key(ctx))
+    failures = sum(isinstance(result, DevinAPIError) for result in results)
+    
+    if output == 'json':
+        click.echo(_json_dumps([
+            {'error': str(result)} if isinstance(result, DevinAPIError) else result
+            for result in results
+        ]))
+    else:
+        icon = '❌' if failures else '✅'
+        lines = [f"\n{icon} Created {len(results) - failures} of {len(results)} session{'s' if len(results) != 1 else ''}"]
+        for line, result in enumerate(results, 1):
+            if isinstance(result, DevinAPIError):
+                lines.append(f"  {line}. ❌ {result}")
+            else:
+                lines.append(f"  {line}. {result.get('session_id', 'N/A')} {result.get('url', '')}")
+        click.echo('\n'.join(lines))
+    
+    if failures:
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--prompt', '-p', help='The task description for Devin')
 @click.option('--snapshot-id', help='ID of a machine snapshot to use')
@@ -223,13 +630,59 @@ def auth(test):
 @click.option('--knowledge-ids', help='Comma-separated list of knowledge IDs to use')
 @click.option('--tags', help='Comma-separated list of tags to add to the session')
 @click.option('--title', help='Custom title for the session')
-@click.option('--output', '-o', type=click.Choice(['json', 'table']), default='table', help='Output format')
-def create(prompt, snapshot_id, unlisted, idempotent, max_acu_limit, 
-          secret_ids, knowledge_ids, tags, title, output):
+@click.option('--interactive-batch', is_flag=True, help='Fill in all session fields at once in $EDITOR')
+@click.option('--batch', type=click.File('r'), help='Create one session per line of a JSON Lines file of payloads')
+@output_option
+@click.pass_context
+def create(ctx, prompt, snapshot_id, unlisted, idempotent, max_acu_limit, 
+          secret_ids, knowledge_ids, tags, title, interactive_batch, batch, output):
     """Create a new Devin session (interactive by default)"""
+    _prewarm_connection()
+    
+    if batch is not None:
+        # Each batch line carries its own fields, so per-session options would be ignored
+        given = {
+            'prompt': prompt, 'snapshot_id': snapshot_id, 'unlisted': unlisted,
+            'idempotent': idempotent, 'max_acu_limit': max_acu_limit, 'secret_ids': secret_ids,
+            'knowledge_ids': knowledge_ids, 'tags': tags, 'title': title,
+            'interactive_batch': interactive_batch or None,
+        }
+        conflicts = [f"--{name.replace('_', '-')}" for name, value in given.items() if value is not None]
+        if conflicts:
+            raise click.UsageError(f"--batch cannot be combined with {', '.join(conflicts)}; "
+                                   "set session fields on each line of the batch file instead")
+        _create_batch(ctx, batch, output)
+        return
+    
+    if interactive_batch:
+        # Pre-fill the template with anything already given on the command line
+        current = {
+            'prompt': prompt, 'snapshot_id': snapshot_id, 'max_acu_limit': max_acu_limit,
+            'secret_ids': secret_ids, 'knowledge_ids': knowledge_ids, 'tags': tags, 'title': title,
+            'unlisted': {True: 'yes', False: 'no'}.get(unlisted),
+            'idempotent': {True: 'yes', False: 'no'}.get(idempotent),
+        }
+        for name, value in current.items():
+            if name != 'prompt' and isinstance(value, str) and '\n' in value:
+                raise click.BadParameter("must be a single line", param_hint=f"--{name.replace('_', '-')}")
+        edited = click.edit(_BATCH_TEMPLATE.format(**{k: '' if v is None else v for k, v in current.items()}))
+        if edited is None:
+            raise click.ClickException("Editor closed without saving; no session created.")
+        values = parse_batch_input(edited)
+        if not values.get('prompt'):
+            raise click.ClickException("A prompt is required to create a session.")
+        prompt = values['prompt']
+        snapshot_id = values.get('snapshot_id')
+        unlisted = values.get('unlisted')
+        idempotent = values.get('idempotent')
+        max_acu_limit = values.get('max_acu_limit')
+        secret_ids = values.get('secret_ids')
+        knowledge_ids = values.get('knowledge_ids')
+        tags = values.get('tags')
+        title = values.get('title')
     
     # If no prompt provided, go into full interactive mode
-    if not prompt:
+    elif not prompt:
         prompt = click.prompt('Task description for Devin', type=str)
         
         # Prompt for all optional fields in interactive mode
@@ -261,40 +714,34 @@ def create(prompt, snapshot_id, unlisted, idempotent, max_acu_limit,
             title = title if title else None
 
     # Build the request payload
-    payload = {'prompt': prompt}
-    
-    # Add optional parameters if provided
-    if snapshot_id:
-        payload['snapshot_id'] = snapshot_id
-    if unlisted is not None:
-        payload['unlisted'] = unlisted
-    if idempotent is not None:
-        payload['idempotent'] = idempotent
-    if max_acu_limit is not None:
-        payload['max_acu_limit'] = max_acu_limit
-    if secret_ids:
-        payload['secret_ids'] = parse_list_input(secret_ids)
-    if knowledge_ids:
-        payload['knowledge_ids'] = parse_list_input(knowledge_ids)
-    if tags:
-        payload['tags'] = parse_list_input(tags)
-    if title:
-        payload['title'] = title
+    payload = build_create_payload(
+        prompt,
+        snapshot_id=snapshot_id,
+        unlisted=unlisted,
+        idempotent=idempotent,
+        max_acu_limit=max_acu_limit,
+        secret_ids=secret_ids,
+        knowledge_ids=knowledge_ids,
+        tags=tags,
+        title=title
+    )
 
     try:
         # Make the API request
         click.echo("Creating Devin session...")
-        result = make_api_request(payload)
+        result = make_api_request(payload, api_key=get_context_api_key(ctx))
         
         # Output the result
         if output == 'json':
-            click.echo(json.dumps(result, indent=2))
+            click.echo(_json_dumps(result))
         else:
-            # Table format
-            click.echo("\n✅ Session created successfully!")
-            click.echo(f"Session ID: {result.get('session_id', 'N/A')}")
-            click.echo(f"URL: {result.get('url', 'N/A')}")
-            click.echo(f"New Session: {result.get('is_new_session', 'N/A')}")
+            # Table format, written in one go
+            click.echo('\n'.join([
+                "\n✅ Session created successfully!",
+                f"Session ID: {result.get('session_id', 'N/A')}",
+                f"URL: {result.get('url', 'N/A')}",
+                f"New Session: {result.get('is_new_session', 'N/A')}",
+            ]))
             
     except DevinAPIError as e:
         click.echo(f"❌ Error: {e}", err=True)
@@ -306,35 +753,41 @@ def create(prompt, snapshot_id, unlisted, idempotent, max_acu_limit,
 
 @cli.command()
 @click.argument('session_id')
-@click.option('--output', '-o', type=click.Choice(['json', 'table']), default='table', help='Output format')
-def get(session_id, output):
+@output_option
+@click.pass_context
+def get(ctx, session_id, output):
     """Get details of an existing Devin session"""
+    _prewarm_connection()
     try:
         click.echo(f"Retrieving session details for {session_id}...")
-        result = get_session_details(session_id)
+        result = get_session_details(session_id, api_key=get_context_api_key(ctx))
         
         # Output the result
         if output == 'json':
-            click.echo(json.dumps(result, indent=2))
+            click.echo(_json_dumps(result))
         else:
-            # Table format
-            click.echo("\n📄 Session Details:")
-            click.echo(f"Session ID: {result.get('session_id', 'N/A')}")
-            click.echo(f"Status: {result.get('status', 'N/A')}")
-            click.echo(f"Title: {result.get('title', 'N/A')}")
-            click.echo(f"Created: {result.get('created_at', 'N/A')}")
-            click.echo(f"Updated: {result.get('updated_at', 'N/A')}")
+            # Table format, collected and written in one go
+            lines = [
+                "\n📄 Session Details:",
+                f"Session ID: {result.get('session_id', 'N/A')}",
+                f"Status: {result.get('status', 'N/A')}",
+                f"Title: {result.get('title', 'N/A')}",
+                f"Created: {result.get('created_at', 'N/A')}",
+                f"Updated: {result.get('updated_at', 'N/A')}",
+            ]
             
             if result.get('tags'):
-                click.echo(f"Tags: {', '.join(result['tags'])}")
+                lines.append(f"Tags: {', '.join(result['tags'])}")
             
             messages = result.get('messages', [])
             if messages:
-                click.echo(f"\n💬 Messages ({len(messages)} total):")
+                lines.append(f"\n💬 Messages ({len(messages)} total):")
                 for i, msg in enumerate(messages[:3]):  # Show first 3 messages
-                    click.echo(f"  {i+1}. {msg.get('role', 'unknown')}: {msg.get('content', '')[:100]}...")
+                    lines.append(f"  {i+1}. {msg.get('role', 'unknown')}: {msg.get('content', '')[:100]}...")
                 if len(messages) > 3:
-                    click.echo(f"  ... and {len(messages) - 3} more messages")
+                    lines.append(f"  ... and {len(messages) - 3} more messages")
+            
+            click.echo('\n'.join(lines))
                     
     except DevinAPIError as e:
         click.echo(f"❌ Error: {e}", err=True)
@@ -347,9 +800,11 @@ def get(session_id, output):
 @cli.command()
 @click.argument('session_id')
 @click.option('--message', '-m', help='Message to send to the session')
-@click.option('--output', '-o', type=click.Choice(['json', 'table']), default='table', help='Output format')
-def message(session_id, message, output):
+@output_option
+@click.pass_context
+def message(ctx, session_id, message, output):
     """Send a message to an existing Devin session"""
+    _prewarm_connection()
     
     # If no message provided, prompt for it
     if not message:
@@ -359,18 +814,19 @@ def message(session_id, message, output):
     
     try:
         click.echo(f"Sending message to session {session_id}...")
-        result = send_message_to_session(session_id, payload)
+        result = send_message_to_session(session_id, payload, api_key=get_context_api_key(ctx))
         
         # Output the result
         if output == 'json':
-            click.echo(json.dumps(result, indent=2))
+            click.echo(_json_dumps(result))
         else:
-            # Table format
-            click.echo("\n✅ Message sent successfully!")
+            # Table format, collected and written in one go
+            lines = ["\n✅ Message sent successfully!"]
             if 'message_id' in result:
-                click.echo(f"Message ID: {result['message_id']}")
+                lines.append(f"Message ID: {result['message_id']}")
             if 'status' in result:
-                click.echo(f"Session Status: {result['status']}")
+                lines.append(f"Session Status: {result['status']}")
+            click.echo('\n'.join(lines))
                 
     except DevinAPIError as e:
         click.echo(f"❌ Error: {e}", err=True)
@@ -401,6 +857,8 @@ def setup(target_dir, force):
         }
     ]
     
+    import requests
+    
     target_base = Path(target_dir).resolve()
     success_count = 0
     
@@ -419,12 +877,12 @@ def setup(target_dir, force):
         # Download the file
         try:
             click.echo(f"📥 Downloading {file_info['description']}...")
-            response = requests.get(file_info['url'], timeout=10)
+            response = _get_session().get(file_info['url'], timeout=10)
             response.raise_for_status()
             
-            # Write the content to file
-            with open(target_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            # Write the downloaded bytes as-is, skipping a decode/re-encode round trip
+            with open(target_file, 'wb') as f:
+                f.write(response.content)
             
             click.echo(f"✅ Downloaded {file_info['description']} → {target_file}")
             success_count += 1
@@ -9,7 +9,11 @@ setup(
     install_requires=[
         "click>=8.0.0",
         "requests>=2.25.0",
+        "urllib3>=1.26.0",
     ],
+    extras_require={
+        "fast": ["orjson>=3.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "devin-cli=devin_cli:cli",